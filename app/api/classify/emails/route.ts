@@ -38,6 +38,7 @@ export async function POST(request: Request) {
       exclude_reasoning: !parsed.include_reasoning,
       use_structured_output: parsed.use_structured_output,
       timeout: parsed.timeout,
+      signal: request.signal,
     });
     return NextResponse.json(result);
   } catch (error) {
@@ -1,9 +1,18 @@
-import { DEFAULT_LABELS, OPENROUTER_CONFIG } from "@/lib/backend/config";
+import {
+  CLASSIFY_BATCH_SIZE,
+  DEFAULT_LABELS,
+  OPENROUTER_CONFIG,
+} from "@/lib/backend/config";
 import {
   fetchUnreadMessageDetails,
   normalizeEmailDetails,
 } from "@/lib/backend/gmail";
 import { callOpenRouter, parseOpenRouterJson } from "@/lib/backend/openrouter";
+import {
+  getCachedResponse,
+  responseCacheKey,
+  setCachedResponse,
+} from "@/lib/backend/response-cache";
 import type {
   ClassificationItem,
   ClassificationResult,
@@ -19,6 +28,7 @@ type ClassifyOptions = {
   use_structured_output?: boolean;
   api_url?: string;
   timeout?: number;
+  signal?: AbortSignal;
 };
 
 type ClassifyUnreadOptions = ClassifyOptions & {
@@ -181,7 +191,7 @@ function buildSystemPrompt(labels: string[]): string {
 }
 
 function buildMessages(emailPayloads: UnknownRecord[], labels: string[]) {
-  const systemPrompt = buildSystemPrompt(labels);
+  const systemPrompt = cachedByLabels(systemPromptCache, labels, buildSystemPrompt);
   const userContent = JSON.stringify({ emails: emailPayloads });
   const combined = `${systemPrompt}\n\nInput JSON:\n${userContent}`;
   return [{ role: "user", content: combined }];
@@ -219,34 +229,62 @@ function buildStructuredOutputFormat(labels: string[]): UnknownRecord {
   };
 }
 
-export async function classifyAndSummarizeMessages(
-  emailDetails: EmailDetails[],
-  options: ClassifyOptions = {},
-): Promise<ClassificationResult> {
-  if (!emailDetails.length) {
-    return { items: [] };
-  }
+const LABEL_CACHE_LIMIT = 16;
+const systemPromptCache = new Map<string, string>();
+const structuredOutputCache = new Map<string, UnknownRecord>();
 
-  const chosenModel = options.model ?? OPENROUTER_CONFIG.MODEL;
-  if (!chosenModel) {
-    throw new Error("MODEL is missing. Set MODEL in .env or pass model.");
+function cachedByLabels<T>(
+  cache: Map<string, T>,
+  labels: string[],
+  build: (labels: string[]) => T,
+): T {
+  const key = labels.join("\u0000");
+  const hit = cache.get(key);
+  if (hit !== undefined) {
+    return hit;
   }
+  if (cache.size >= LABEL_CACHE_LIMIT) {
+    cache.clear();
+  }
+  const value = build([...labels]);
+  cache.set(key, value);
+  return value;
+}
 
-  const chosenLabels = options.labels ?? DEFAULT_LABELS;
-  const payloads = emailDetails.map((item) =>
-    normalizeEmailDetails(item),
-  ) as UnknownRecord[];
-  const messages = buildMessages(payloads, chosenLabels);
+async function classifyBatch(
+  payloads: UnknownRecord[],
+  model: string,
+  labels: string[],
+  options: ClassifyOptions,
+): Promise<ClassificationResult> {
   const useStructured = options.use_structured_output ?? true;
-  const response = await callOpenRouter(chosenModel, messages, {
-    max_tokens: options.max_tokens ?? 800,
-    reasoning: options.exclude_reasoning ?? true ? { exclude: true } : undefined,
+  const maxTokens = options.max_tokens ?? 800;
+  const excludeReasoning = options.exclude_reasoning ?? true;
+  const cacheKey = responseCacheKey([
+    model,
+    labels,
+    payloads,
+    maxTokens,
+    excludeReasoning,
+    useStructured,
+    options.api_url ?? null,
+  ]);
+  const cached = getCachedResponse(cacheKey);
+  if (cached) {
+    return cached;
+  }
+
+  const messages = buildMessages(payloads, labels);
+  const response = await callOpenRouter(model, messages, {
+    max_tokens: maxTokens,
+    reasoning: excludeReasoning ? { exclude: true } : undefined,
     response_format: useStructured
-      ? buildStructuredOutputFormat(chosenLabels)
+      ? cachedByLabels(structuredOutputCache, labels, buildStructuredOutputFormat)
       : undefined,
     provider: useStructured ? { require_parameters: true } : undefined,
     api_url: options.api_url,
     timeout: options.timeout ?? 120,
+    signal: options.signal,
   });
 
   if (!response) {
@@ -259,23 +297,28 @@ export async function classifyAndSummarizeMessages(
   const { parsed, content } = parseOpenRouterJson(response);
   if (parsed) {
     const items = extractItemsFromAny(parsed);
-    const subjectById = new Map(payloads.map((item) => [safeString(item.id), safeString(item.subject)]));
-    const senderById = new Map(payloads.map((item) => [safeString(item.id), safeString(item.sender)]));
+    const payloadById = new Map(payloads.map((item) => [safeString(item.id), item]));
     for (const item of items) {
-      if (item.id && !item.subject) {
-        item.subject = subjectById.get(item.id) ?? "";
+      const source = item.id ? payloadById.get(item.id) : undefined;
+      if (!source) {
+        continue;
       }
-      if (item.id && !item.sender) {
-        item.sender = senderById.get(item.id) ?? "";
+      if (!item.subject) {
+        item.subject = safeString(source.subject);
+      }
+      if (!item.sender) {
+        item.sender = safeString(source.sender);
       }
     }
     if (items.length > 0) {
-      return { items };
+      const result = { items };
+      setCachedResponse(cacheKey, result);
+      return result;
     }
     return {
       items: [],
       error: "Parsed OpenRouter response but found no classification items.",
-      raw_content: content,
+      raw_content: content || JSON.stringify(parsed),
       raw_response: response,
     };
   }
@@ -288,6 +331,40 @@ export async function classifyAndSummarizeMessages(
   };
 }
 
+export async function classifyAndSummarizeMessages(
+  emailDetails: EmailDetails[],
+  options: ClassifyOptions = {},
+): Promise<ClassificationResult> {
+  if (!emailDetails.length) {
+    return { items: [] };
+  }
+
+  const chosenModel = options.model ?? OPENROUTER_CONFIG.MODEL;
+  if (!chosenModel) {
+    throw new Error("MODEL is missing. Set MODEL in .env or pass model.");
+  }
+
+  const chosenLabels = options.labels ?? DEFAULT_LABELS;
+  const payloads = emailDetails.map((item) =>
+    normalizeEmailDetails(item),
+  ) as UnknownRecord[];
+  if (payloads.length <= CLASSIFY_BATCH_SIZE) {
+    return classifyBatch(payloads, chosenModel, chosenLabels, options);
+  }
+
+  const batches: UnknownRecord[][] = [];
+  for (let start = 0; start < payloads.length; start += CLASSIFY_BATCH_SIZE) {
+    batches.push(payloads.slice(start, start + CLASSIFY_BATCH_SIZE));
+  }
+  const results = await Promise.all(
+    batches.map((batch) => classifyBatch(batch, chosenModel, chosenLabels, options)),
+  );
+
+  const items = results.flatMap((result) => result.items);
+  const failed = results.find((result) => result.error);
+  return failed ? { ...failed, items } : { items };
+}
+
 export async function classifyUnreadGmail(
   options: ClassifyUnreadOptions = {},
 ): Promise<ClassificationResult> {
@@ -9,6 +9,7 @@ export const DEFAULT_LABELS = [
   "non_importante",
 ];
 export const MAX_BODY_CHARS = 4000;
+export const CLASSIFY_BATCH_SIZE = 20;
 
 type OpenRouterConfig = {
   MODEL?: string;
@@ -49,15 +50,8 @@ const ENV_PATH = path.join(REPO_ROOT, ".env");
 const TOKEN_PATH = path.join(REPO_ROOT, "token.json");
 const CREDENTIALS_PATH = path.join(REPO_ROOT, "credentials.json");
 
-function stripQuoted(value: string): string {
-  if (
-    (value.startsWith('"') && value.endsWith('"')) ||
-    (value.startsWith("'") && value.endsWith("'"))
-  ) {
-    return value.slice(1, -1);
-  }
-  return value;
-}
+const ENV_LINE =
+  /^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:"([^"\n]*)"|'([^'\n]*)'|(.*?))[ \t]*$/gm;
 
 function readDotEnvFile(dotenvPath: string): Record<string, string> {
   if (!fs.existsSync(dotenvPath)) {
@@ -66,23 +60,9 @@ function readDotEnvFile(dotenvPath: string): Record<string, string> {
 
   const raw = fs.readFileSync(dotenvPath, "utf-8");
   const output: Record<string, string> = {};
-
-  for (const line of raw.split(/\r?\n/)) {
-    const trimmed = line.trim();
-    if (!trimmed || trimmed.startsWith("#")) {
-      continue;
-    }
-    const eq = trimmed.indexOf("=");
-    if (eq < 0) {
-      continue;
-    }
-    const key = trimmed.slice(0, eq).trim();
-    const value = stripQuoted(trimmed.slice(eq + 1).trim());
-    if (key) {
-      output[key] = value;
-    }
+  for (const match of raw.matchAll(ENV_LINE)) {
+    output[match[1] as string] = match[2] ?? match[3] ?? match[4] ?? "";
   }
-
   return output;
 }
 
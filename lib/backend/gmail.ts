@@ -33,6 +33,11 @@ type StoredToken = {
   scopes?: string[];
 };
 
+type GmailBatchItem = {
+  status: number;
+  body: string;
+};
+
 type GmailListResponse = {
   messages?: Array<{ id: string }>;
 };
@@ -59,6 +64,35 @@ type GmailMessage = {
   payload?: GmailPart;
 };
 
+const GMAIL_BATCH_URL = "https://gmail.googleapis.com/batch/gmail/v1";
+const GMAIL_BATCH_LIMIT = 100;
+const GMAIL_FETCH_CONCURRENCY = 5;
+const GMAIL_RETRY_ATTEMPTS = 3;
+const GMAIL_RETRY_BASE_MS = 500;
+
+class GmailApiError extends Error {
+  readonly status: number;
+
+  constructor(status: number, message: string) {
+    super(message);
+    this.status = status;
+  }
+}
+
+// Partial responses: only the parts of a message getDetails actually reads.
+// The mask has to spell out each nesting level; deeper trees are refetched.
+const PART_FIELDS = "mimeType,filename,body(attachmentId,data)";
+const PART_FIELD_DEPTH = 8;
+
+function nestedPartFields(depth: number): string {
+  return depth === 0
+    ? PART_FIELDS
+    : `${PART_FIELDS},parts(${nestedPartFields(depth - 1)})`;
+}
+
+const FULL_MESSAGE_FIELDS =
+  `id,snippet,payload(headers(name,value),${nestedPartFields(PART_FIELD_DEPTH)})`;
+
 function isRecord(value: unknown): value is UnknownRecord {
   return typeof value === "object" && value !== null;
 }
@@ -167,20 +201,44 @@ async function refreshToken(token: StoredToken): Promise<StoredToken> {
   return nextToken;
 }
 
+let cachedToken: StoredToken | null = null;
+let pendingRefresh: Promise<StoredToken> | null = null;
+
+// Forget the in-memory token so the next call reloads token.json from disk.
+function invalidateAccessToken(): void {
+  cachedToken = null;
+}
+
 async function getAccessToken(): Promise<string> {
-  const token = loadStoredToken();
+  if (cachedToken && hasUsableToken(cachedToken)) {
+    return cachedToken.token as string;
+  }
+
+  const token = cachedToken ?? loadStoredToken();
   if (!token) {
     throw new Error(
       `Missing ${TOKEN_PATH}. Run OAuth bootstrap once to generate token.json.`,
     );
   }
   if (hasUsableToken(token)) {
+    cachedToken = token;
     return token.token as string;
   }
-  const refreshed = await refreshToken(token);
+
+  // Share one in-flight refresh between concurrent requests.
+  pendingRefresh ??= refreshToken(token)
+    .catch((error: unknown) => {
+      invalidateAccessToken();
+      throw error;
+    })
+    .finally(() => {
+      pendingRefresh = null;
+    });
+  const refreshed = await pendingRefresh;
   if (!refreshed.token) {
     throw new Error("Unable to obtain Gmail access token.");
   }
+  cachedToken = refreshed;
   return refreshed.token;
 }
 
@@ -203,7 +261,11 @@ async function gmailGet<T>(
     ? await response.json()
     : await response.text();
   if (!response.ok) {
-    throw new Error(
+    if (response.status === 401) {
+      invalidateAccessToken();
+    }
+    throw new GmailApiError(
+      response.status,
       `Gmail API ${apiPath} failed (${response.status}): ${
         typeof body === "string" ? body : JSON.stringify(body)
       }`,
@@ -212,45 +274,184 @@ async function gmailGet<T>(
   return body as T;
 }
 
-function headerMap(headers: GmailHeader[] | undefined): Record<string, string> {
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+async function gmailGetWithBackoff<T>(
+  apiPath: string,
+  accessToken: string,
+  params: URLSearchParams,
+): Promise<T> {
+  for (let attempt = 0; ; attempt += 1) {
+    // The item was just rate-limited or failed, so wait before every attempt.
+    await sleep(GMAIL_RETRY_BASE_MS * 2 ** attempt * (1 + Math.random()));
+    try {
+      return await gmailGet<T>(apiPath, accessToken, params);
+    } catch (error) {
+      const retryable =
+        error instanceof GmailApiError && isRetryableStatus(error.status);
+      if (!retryable || attempt + 1 >= GMAIL_RETRY_ATTEMPTS) {
+        throw error;
+      }
+    }
+  }
+}
+
+function buildBatchBody(
+  boundary: string,
+  apiPaths: string[],
+  params: URLSearchParams,
+): string {
+  const query = params.toString();
+  const parts = apiPaths.map(
+    (apiPath, index) =>
+      `--${boundary}\r\n` +
+      "Content-Type: application/http\r\n" +
+      `Content-ID: <item-${index}>\r\n\r\n` +
+      `GET /gmail/v1/${apiPath}?${query}\r\n\r\n`,
+  );
+  return `${parts.join("")}--${boundary}--\r\n`;
+}
+
+function parseBatchResponse(text: string, boundary: string): Map<number, GmailBatchItem> {
+  const items = new Map<number, GmailBatchItem>();
+  for (const chunk of text.split(`--${boundary}`)) {
+    const idMatch = /Content-ID:\s*<response-item-(\d+)>/i.exec(chunk);
+    const statusMatch = /HTTP\/[\d.]+\s+(\d{3})/.exec(chunk);
+    if (!idMatch || !statusMatch) {
+      continue;
+    }
+    const response = chunk.slice(statusMatch.index);
+    const bodyStart = response.search(/\r?\n\r?\n/);
+    items.set(Number(idMatch[1]), {
+      status: Number(statusMatch[1]),
+      body: bodyStart < 0 ? "" : response.slice(bodyStart).trim(),
+    });
+  }
+  return items;
+}
+
+function isRetryableStatus(status: number): boolean {
+  return status === 429 || status >= 500;
+}
+
+async function gmailBatchGet<T>(
+  apiPaths: string[],
+  accessToken: string,
+  params: URLSearchParams,
+): Promise<T[]> {
+  const boundary = `batch_${Date.now().toString(36)}`;
+  const response = await fetch(GMAIL_BATCH_URL, {
+    method: "POST",
+    headers: {
+      Authorization: `Bearer ${accessToken}`,
+      "Content-Type": `multipart/mixed; boundary=${boundary}`,
+    },
+    body: buildBatchBody(boundary, apiPaths, params),
+    cache: "no-store",
+  });
+
+  const text = await response.text();
+  if (!response.ok) {
+    if (response.status === 401) {
+      invalidateAccessToken();
+    }
+    throw new Error(`Gmail API batch failed (${response.status}): ${text}`);
+  }
+  const contentType = response.headers.get("content-type") ?? "";
+  const responseBoundary = /boundary="?([^";]+)"?/i.exec(contentType)?.[1];
+  if (!responseBoundary) {
+    throw new Error("Gmail API batch response missing multipart boundary.");
+  }
+
+  const items = parseBatchResponse(text, responseBoundary);
+  const results = new Array<T>(apiPaths.length);
+  const retryIndexes: number[] = [];
+  apiPaths.forEach((apiPath, index) => {
+    const item = items.get(index);
+    if (!item || isRetryableStatus(item.status)) {
+      retryIndexes.push(index);
+      return;
+    }
+    if (item.status < 200 || item.status >= 300) {
+      throw new Error(`Gmail API ${apiPath} failed (${item.status}): ${item.body}`);
+    }
+    results[index] = JSON.parse(item.body) as T;
+  });
+
+  // Batches often rate-limit a subset of their items; refetch those directly.
+  await mapWithConcurrency(retryIndexes, GMAIL_FETCH_CONCURRENCY, async (index) => {
+    results[index] = await gmailGetWithBackoff<T>(
+      apiPaths[index] as string,
+      accessToken,
+      params,
+    );
+  });
+  return results;
+}
+
+const DETAIL_HEADERS = ["subject", "from", "date"];
+
+function headerMap(
+  headers: GmailHeader[] | undefined,
+  wanted: string[] = DETAIL_HEADERS,
+): Record<string, string> {
   const mapped: Record<string, string> = {};
   if (!headers) {
     return mapped;
   }
 
+  let remaining = wanted.length;
   for (const header of headers) {
-    const name =
-      typeof header.name === "string" ? header.name.toLowerCase() : undefined;
-    if (!name || mapped[name]) {
+    if (typeof header.name !== "string") {
+      continue;
+    }
+    const name = header.name.toLowerCase();
+    if (mapped[name] || !wanted.includes(name)) {
       continue;
     }
     mapped[name] = typeof header.value === "string" ? header.value : "";
+    if (!mapped[name]) {
+      continue;
+    }
+    remaining -= 1;
+    if (remaining === 0) {
+      break;
+    }
   }
   return mapped;
 }
 
-function decodeBody(data: string | undefined): string {
+function decodeBody(data: string | undefined, limit?: number): string {
   if (!data) {
     return "";
   }
 
-  const normalized = data.replace(/-/g, "+").replace(/_/g, "/");
-  const padding = normalized.length % 4 === 0 ? "" : "=".repeat(4 - (normalized.length % 4));
-  return Buffer.from(`${normalized}${padding}`, "base64").toString("utf-8");
+  // Each UTF-16 unit needs at most 3 bytes (4 base64 chars), so this prefix
+  // still decodes past `limit` and keeps the truncation marker downstream.
+  const source = limit === undefined ? data : data.slice(0, (limit + 1) * 4);
+  return Buffer.from(source, "base64url").toString("utf-8");
 }
 
-function* iterParts(payload: GmailPart | undefined): Generator<GmailPart> {
-  if (!payload) {
+function walkParts(part: GmailPart | undefined, visit: (part: GmailPart) => void): void {
+  if (!part) {
     return;
   }
-  const stack: GmailPart[] = [payload];
-  while (stack.length > 0) {
-    const current = stack.pop() as GmailPart;
-    yield current;
-    for (const part of current.parts ?? []) {
-      stack.push(part);
-    }
+  visit(part);
+  for (const child of part.parts ?? []) {
+    walkParts(child, visit);
+  }
+}
+
+function appendDecoded(chunks: string[], used: number, data: string): number {
+  if (used > MAX_BODY_CHARS) {
+    return used;
   }
+  const separator = chunks.length > 0 ? 2 : 0;
+  const decoded = decodeBody(data, Math.max(0, MAX_BODY_CHARS - used - separator));
+  chunks.push(decoded);
+  return used + separator + decoded.length;
 }
 
 function bodyAndAttachments(payload: GmailPart | undefined): {
@@ -258,29 +459,36 @@ function bodyAndAttachments(payload: GmailPart | undefined): {
   attachments: boolean;
 } {
   const plainChunks: string[] = [];
-  const htmlChunks: string[] = [];
+  const htmlData: string[] = [];
+  let plainLength = 0;
   let attachments = false;
 
-  for (const part of iterParts(payload)) {
+  walkParts(payload, (part) => {
     const body = part.body ?? {};
     if (part.filename || body.attachmentId) {
       attachments = true;
     }
     if (!body.data) {
-      continue;
+      return;
     }
-    const decoded = decodeBody(body.data);
     if (part.mimeType === "text/plain") {
-      plainChunks.push(decoded);
-    } else if (part.mimeType === "text/html") {
-      htmlChunks.push(decoded);
+      plainLength = appendDecoded(plainChunks, plainLength, body.data);
+    } else if (part.mimeType === "text/html" && plainChunks.length === 0) {
+      htmlData.push(body.data);
+    }
+  });
+
+  // HTML is only a fallback, so decode it only when no text/plain part exists.
+  if (plainChunks.length === 0) {
+    const htmlChunks: string[] = [];
+    let htmlLength = 0;
+    for (const data of htmlData) {
+      htmlLength = appendDecoded(htmlChunks, htmlLength, data);
     }
+    return { body: htmlChunks.join("\n\n"), attachments };
   }
 
-  return {
-    body: (plainChunks.length > 0 ? plainChunks : htmlChunks).join("\n\n"),
-    attachments,
-  };
+  return { body: plainChunks.join("\n\n"), attachments };
 }
 
 function truncate(text: string, limit: number): string {
@@ -326,6 +534,16 @@ async function mapWithConcurrency<T, R>(
   return results;
 }
 
+function exceedsPartFieldDepth(part: GmailPart | undefined, depth: number = 0): boolean {
+  if (!part) {
+    return false;
+  }
+  if (depth === PART_FIELD_DEPTH) {
+    return /^(multipart|message)\//.test(part.mimeType ?? "");
+  }
+  return (part.parts ?? []).some((child) => exceedsPartFieldDepth(child, depth + 1));
+}
+
 function getDetails(message: GmailMessage): EmailDetails {
   const payload = message.payload;
   const headers = headerMap(payload?.headers);
@@ -372,17 +590,36 @@ export async function fetchUnreadMessageDetails(
   );
   const messages = Array.isArray(list.messages) ? list.messages : [];
 
-  const details = await mapWithConcurrency(messages, 5, async (message) => {
-      const getParams = new URLSearchParams({ format: "full" });
-      const full = await gmailGet<GmailMessage>(
+  const details: EmailDetails[] = [];
+  for (let start = 0; start < messages.length; start += GMAIL_BATCH_LIMIT) {
+    const chunk = messages.slice(start, start + GMAIL_BATCH_LIMIT);
+    const apiPaths = chunk.map(
+      (message) =>
         `users/${encodeURIComponent(userId)}/messages/${encodeURIComponent(message.id)}`,
+    );
+    const fullMessages = await gmailBatchGet<GmailMessage>(
+      apiPaths,
+      accessToken,
+      new URLSearchParams({ format: "full", fields: FULL_MESSAGE_FIELDS }),
+    );
+
+    // MIME trees deeper than the fields mask come back cut; refetch them whole.
+    const truncated = fullMessages
+      .map((full, index) => (exceedsPartFieldDepth(full.payload) ? index : -1))
+      .filter((index) => index >= 0);
+    await mapWithConcurrency(truncated, GMAIL_FETCH_CONCURRENCY, async (index) => {
+      fullMessages[index] = await gmailGet<GmailMessage>(
+        apiPaths[index] as string,
         accessToken,
-        getParams,
+        new URLSearchParams({ format: "full" }),
       );
+    });
+    fullMessages.forEach((full, index) => {
       const item = getDetails(full);
-      item.message_id = message.id;
-      return item;
+      item.message_id = chunk[index]?.id;
+      details.push(item);
     });
+  }
 
   return details;
 }
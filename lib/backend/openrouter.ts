@@ -14,6 +14,7 @@ type CallOpenRouterOptions = {
   api_url?: string;
   timeout?: number;
   headers?: Record<string, string>;
+  signal?: AbortSignal;
 };
 
 function isRecord(value: unknown): value is UnknownRecord {
@@ -49,53 +50,33 @@ function contentFromParts(content: unknown): string | undefined {
   return undefined;
 }
 
-function extractParsedJson(response: unknown): UnknownRecord | undefined {
+function extractResponse(response: unknown): {
+  parsed: UnknownRecord | undefined;
+  content: string;
+} {
   if (!isRecord(response)) {
-    return undefined;
+    return { parsed: undefined, content: "" };
   }
   if (isRecord(response.parsed)) {
-    return response.parsed;
+    return { parsed: response.parsed, content: "" };
   }
 
   const choices = response.choices;
-  if (!Array.isArray(choices) || choices.length === 0 || !isRecord(choices[0])) {
-    return undefined;
-  }
-  const message = choices[0].message;
-  if (!isRecord(message)) {
-    return undefined;
-  }
-
-  if (isRecord(message.parsed)) {
-    return message.parsed;
-  }
-  if (isRecord(message.content)) {
-    return message.content;
+  const first =
+    Array.isArray(choices) && isRecord(choices[0]) ? choices[0] : undefined;
+  const message = first && isRecord(first.message) ? first.message : undefined;
+  if (message && isRecord(message.parsed)) {
+    return { parsed: message.parsed, content: "" };
   }
-  return undefined;
-}
-
-function extractContent(response: unknown): string {
-  if (!isRecord(response)) {
-    return "";
-  }
-
-  const topLevel = contentFromParts(response.content);
-  if (topLevel) {
-    return topLevel;
+  if (message && isRecord(message.content)) {
+    return { parsed: message.content, content: "" };
   }
 
-  const choices = response.choices;
-  if (!Array.isArray(choices) || choices.length === 0 || !isRecord(choices[0])) {
-    return "";
-  }
-  const first = choices[0];
-  const message = isRecord(first.message) ? first.message : {};
-  const fromMessage = contentFromParts(message.content);
-  if (fromMessage) {
-    return fromMessage;
-  }
-  return typeof first.text === "string" ? first.text : "";
+  const content =
+    contentFromParts(response.content) ??
+    contentFromParts(message?.content) ??
+    (typeof first?.text === "string" ? first.text : "");
+  return { parsed: undefined, content };
 }
 
 function stripCodeFences(text: string): string {
@@ -172,11 +153,13 @@ export async function callOpenRouter(
       method: "POST",
       headers: {
         Authorization: `Bearer ${apiKey}`,
-        "Content-Type": "application/json",
+        "Content-Type": "application/json; charset=utf-8",
         ...(options.headers ?? {}),
       },
       body: JSON.stringify(payload),
-      signal: controller.signal,
+      signal: options.signal
+        ? AbortSignal.any([controller.signal, options.signal])
+        : controller.signal,
       cache: "no-store",
     });
 
@@ -212,12 +195,9 @@ export function parseOpenRouterJson(response: unknown): {
   parsed: UnknownRecord | undefined;
   content: string;
 } {
-  const parsedJson = extractParsedJson(response);
-  if (parsedJson) {
-    return { parsed: parsedJson, content: JSON.stringify(parsedJson) };
+  const extracted = extractResponse(response);
+  if (extracted.parsed) {
+    return extracted;
   }
-
-  const content = extractContent(response);
-  const parsed = parseJsonContent(content);
-  return { parsed, content };
+  return { parsed: parseJsonContent(extracted.content), content: extracted.content };
 }
@@ -0,0 +1,42 @@
+import { createHash } from "node:crypto";
+
+import type { ClassificationResult } from "@/lib/backend/types";
+
+type Entry = {
+  value: ClassificationResult;
+  expiresAt: number;
+};
+
+const TTL_MS = 60 * 60_000;
+const MAX_ENTRIES = 512;
+const entries = new Map<string, Entry>();
+
+export function responseCacheKey(parts: unknown[]): string {
+  return createHash("sha256").update(JSON.stringify(parts)).digest("hex");
+}
+
+export function getCachedResponse(key: string): ClassificationResult | undefined {
+  const entry = entries.get(key);
+  if (!entry) {
+    return undefined;
+  }
+  if (entry.expiresAt <= Date.now()) {
+    entries.delete(key);
+    return undefined;
+  }
+  // Re-insert so Map iteration order tracks recency for eviction.
+  entries.delete(key);
+  entries.set(key, entry);
+  return entry.value;
+}
+
+export function setCachedResponse(key: string, value: ClassificationResult): void {
+  entries.delete(key);
+  if (entries.size >= MAX_ENTRIES) {
+    const oldest = entries.keys().next().value;
+    if (oldest !== undefined) {
+      entries.delete(oldest);
+    }
+  }
+  entries.set(key, { value, expiresAt: Date.now() + TTL_MS });
+}